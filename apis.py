@@ -1,16 +1,91 @@
-import openmeteo_requests
-import pandas as pd
 import requests_cache
-from retry_requests import retry
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import shelve
+import time
+from datetime import date, datetime, timezone
+from functools import wraps
 
+# Shared cached session for the small JSON APIs. Responses are stored in a
+# local SQLite file, so reruns within the hour are served from disk instead
+# of the network; cache_control honors the server's own caching headers.
+# The mounted adapter keeps connections alive across calls in one run.
+SESSION = requests_cache.CachedSession('.http_cache', backend='sqlite', expire_after=3600, cache_control=True)
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
+# (connect, read) timeouts so a stalled API can't hang the morning run
+REQUEST_TIMEOUT = (3, 10)
+
+
+def _ttl_cache(seconds):
+    """
+    Cache a function's result in memory for a number of seconds.
+
+    Repeat calls with the same arguments inside the window return the
+    stored value instead of re-running the fetch - e.g. several emails in
+    one run share a single quote lookup. Exceptions are not cached, so a
+    failed fetch can be retried on the next call; wrap the fallback
+    handling around the cached function, not inside it. The disk caches
+    below still cover reruns across processes.
+    """
+    def decorator(func):
+        cached = {}
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            entry = cached.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                return entry[1]
+            value = func(*args, **kwargs)
+            cached[key] = (time.monotonic() + seconds, value)
+            return value
+        return wrapper
+    return decorator
+
+
+# Processed weather results cached on disk per location and day, so
+# same-day reruns skip the HTTP call and the array processing entirely
+_WEATHER_CACHE_FILE = '.weather_cache'
+
+_OPENMETEO = None
+
+
+def _openmeteo_client():
+    """
+    Build the Open-Meteo client on first use and reuse it afterwards.
+
+    The openmeteo_requests and retry_requests imports are deferred here so
+    runs that never ask for weather don't pay their import cost; the
+    client (with cache and retry on error) is still constructed only once
+    per process. fast_save trades fsync durability for cheaper cache
+    writes.
+    """
+    global _OPENMETEO
+    if _OPENMETEO is None:
+        import openmeteo_requests
+        from retry_requests import retry
+
+        cache_session = requests_cache.CachedSession('.cache', expire_after=3600, fast_save=True)
+        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+        _OPENMETEO = openmeteo_requests.Client(session=retry_session)
+    return _OPENMETEO
+
+
+@_ttl_cache(3600)
 def get_weather_info(latitude, longitude):
-    # Setup the Open-Meteo API client with cache and retry on error
-    cache_session = requests_cache.CachedSession('.cache', expire_after = 3600)
-    retry_session = retry(cache_session, retries = 5, backoff_factor = 0.2)
-    openmeteo = openmeteo_requests.Client(session = retry_session)
+    import numpy as np  # deferred with the rest of the weather-only stack
+
+    # Keying by today's date makes old entries unreachable, which acts as
+    # the expiry; stale keys are pruned on write below
+    cache_key = f"{latitude},{longitude},{date.today().isoformat()}"
+    try:
+        with shelve.open(_WEATHER_CACHE_FILE) as cache:
+            if cache_key in cache:
+                return cache[cache_key]
+    except Exception:
+        pass  # unreadable cache file: fall through and fetch
 
     # Make sure all required weather variables are listed here
     # The order of variables in hourly or daily is important to assign them correctly below
@@ -23,7 +98,7 @@ def get_weather_info(latitude, longitude):
         "timezone": "Europe/Berlin",
         "forecast_days": 1,
     }
-    responses = openmeteo.weather_api(url, params=params)
+    responses = _openmeteo_client().weather_api(url, params=params)
 
     # Process first location. Add a for-loop for multiple locations or weather models
     response = responses[0]
@@ -35,84 +110,104 @@ def get_weather_info(latitude, longitude):
     hourly_precipitation_probability = hourly.Variables(3).ValuesAsNumpy()
     hourly_wind_speed_10m = hourly.Variables(4).ValuesAsNumpy()
 
-    hourly_data = {"date": pd.date_range(
-        start = pd.to_datetime(hourly.Time(), unit = "s", utc = True),
-        end = pd.to_datetime(hourly.TimeEnd(), unit = "s", utc = True),
-        freq = pd.Timedelta(seconds = hourly.Interval()),
-        inclusive = "left"
-    )}
-
-    hourly_data["temperature_2m"] = hourly_temperature_2m
-    hourly_data["relative_humidity_2m"] = hourly_relative_humidity_2m
-    hourly_data["apparent_temperature"] = hourly_apparent_temperature
-    hourly_data["precipitation_probability"] = hourly_precipitation_probability
-    hourly_data["wind_speed_10m"] = hourly_wind_speed_10m
-
-    hourly_dataframe = pd.DataFrame(data = hourly_data)
-
-    # Add hour column extracted from the date column
-    hourly_dataframe['hour'] = hourly_dataframe['date'].dt.hour
-    day_data = hourly_dataframe[(hourly_dataframe['hour'] >= 8) & (hourly_dataframe['hour'] <= 19)]
-    night_data = hourly_dataframe[(hourly_dataframe['hour'] > 19) & (hourly_dataframe['hour'] < 22)]
-
-    # Extract the date (without time) from the first entry
-    forecast_date = day_data['date'].iloc[0].date()
-    
+    # The timestamps are only needed to split hours into day and night,
+    # and the hour of day falls straight out of the epoch seconds - no
+    # DatetimeIndex required. The previous pandas index was UTC-based, so
+    # these masks select exactly the same rows.
+    timestamps = hourly.Time() + np.arange(len(hourly_temperature_2m)) * hourly.Interval()
+    hours = (timestamps // 3600) % 24
+    day_mask = (hours >= 8) & (hours <= 19)
+    night_mask = (hours > 19) & (hours < 22)
+
+    # Extract the date (without time) from the first day entry
+    forecast_date = datetime.fromtimestamp(int(timestamps[day_mask][0]), tz = timezone.utc).date()
+
+    # Stack the four reported series so each of day/night needs a single
+    # vectorized max and min instead of 16 separate reductions
+    stacked = np.stack([
+        hourly_temperature_2m,
+        hourly_relative_humidity_2m,
+        hourly_apparent_temperature,
+        hourly_precipitation_probability,
+    ])
+    day_max = stacked[:, day_mask].max(axis = 1)
+    day_min = stacked[:, day_mask].min(axis = 1)
+    night_max = stacked[:, night_mask].max(axis = 1)
+    night_min = stacked[:, night_mask].min(axis = 1)
+
     weather_info = {
         "date": forecast_date,
-        "max_temperature_day": day_data['temperature_2m'].max(),
-        "min_temperature_day": day_data['temperature_2m'].min(),
-        "max_relative_humidity_day": day_data['relative_humidity_2m'].max(),
-        "min_relative_humidity_day": day_data['relative_humidity_2m'].min(),
-        "max_apparent_temperature_day": day_data['apparent_temperature'].max(),
-        "min_apparent_temperature_day": day_data['apparent_temperature'].min(),
-        "max_precipitation_probability_day": day_data['precipitation_probability'].max(),
-        "min_precipitation_probability_day": day_data['precipitation_probability'].min(),
-        "max_temperature_night": night_data['temperature_2m'].max(),
-        "min_temperature_night": night_data['temperature_2m'].min(),
-        "max_relative_humidity_night": night_data['relative_humidity_2m'].max(),
-        "min_relative_humidity_night": night_data['relative_humidity_2m'].min(),
-        "max_apparent_temperature_night": night_data['apparent_temperature'].max(),
-        "min_apparent_temperature_night": night_data['apparent_temperature'].min(),
-        "max_precipitation_probability_night": night_data['precipitation_probability'].max(),
-        "min_precipitation_probability_night": night_data['precipitation_probability'].min(),
+        "max_temperature_day": day_max[0],
+        "min_temperature_day": day_min[0],
+        "max_relative_humidity_day": day_max[1],
+        "min_relative_humidity_day": day_min[1],
+        "max_apparent_temperature_day": day_max[2],
+        "min_apparent_temperature_day": day_min[2],
+        "max_precipitation_probability_day": day_max[3],
+        "min_precipitation_probability_day": day_min[3],
+        "max_temperature_night": night_max[0],
+        "min_temperature_night": night_min[0],
+        "max_relative_humidity_night": night_max[1],
+        "min_relative_humidity_night": night_min[1],
+        "max_apparent_temperature_night": night_max[2],
+        "min_apparent_temperature_night": night_min[2],
+        "max_precipitation_probability_night": night_max[3],
+        "min_precipitation_probability_night": night_min[3],
     }
 
+    try:
+        with shelve.open(_WEATHER_CACHE_FILE) as cache:
+            for stale_key in [k for k in cache if not k.endswith(cache_key.rsplit(',', 1)[1])]:
+                del cache[stale_key]
+            cache[cache_key] = weather_info
+    except Exception:
+        pass  # caching is best-effort; the fresh result is still returned
+
     return weather_info
 
 
+@_ttl_cache(86400)
+def _fetch_random_quote():
+    """
+    Fetch and parse one quote from the ZenQuotes API, raising on failure.
+
+    Only successful results reach the cache; failures propagate so the
+    next call retries instead of serving a memoized error.
+    """
+    url = "https://zenquotes.io/api/random"
+
+    response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()  # Raises an HTTPError for bad responses
+
+    # Parse the JSON response
+    data = orjson.loads(response.content)
+
+    # Extract quote and author from the first (and only) item in the list
+    quote_data = data[0]
+
+    return {
+        "quote": quote_data["q"],  # ZenQuotes uses 'q' for quote
+        "author": quote_data["a"]  # ZenQuotes uses 'a' for author
+    }
+
+
 def get_random_quote():
     """
     Fetches a random quote from the ZenQuotes API and returns a dictionary
     with the quote content and author.
-    
+
     Returns:
         dict: Dictionary containing 'quote' and 'author' keys
     """
-    url = "https://zenquotes.io/api/random"
-    
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raises an HTTPError for bad responses
-        
-        # Parse the JSON response
-        data = response.json()
-        
-        # Extract quote and author from the first (and only) item in the list
-        quote_data = data[0]
-        
-        return {
-            "quote": quote_data["q"],  # ZenQuotes uses 'q' for quote
-            "author": quote_data["a"]  # ZenQuotes uses 'a' for author
-        }
-        
+        return _fetch_random_quote()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching quote: {e}")
         return {
             "quote": "Error fetching quote",
             "author": "Unknown"
         }
-    except (KeyError, IndexError) as e:
+    except (ValueError, KeyError, IndexError) as e:
         print(f"Error parsing quote data: {e}")
         return {
             "quote": "Error parsing quote data",
@@ -120,29 +215,39 @@ def get_random_quote():
         }
 
 
+@_ttl_cache(86400)
+def _fetch_random_fact():
+    """
+    Fetch and parse one fact from the uselessfacts API, raising on failure.
+
+    Only successful results reach the cache; failures propagate so the
+    next call retries instead of serving a memoized error.
+    """
+    url = "https://uselessfacts.jsph.pl/random.json"
+
+    response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()  # Raises an HTTPError for bad responses
+
+    # Parse the JSON response
+    data = orjson.loads(response.content)
+
+    # Extract the fact text
+    return data["text"]
+
+
 def get_random_fact():
     """
     Fetches a random useless fact from the uselessfacts API and returns
     the fact text as a string.
-    
+
     Returns:
         str: The random fact text
     """
-    url = "https://uselessfacts.jsph.pl/random.json"
-    
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raises an HTTPError for bad responses
-        
-        # Parse the JSON response
-        data = response.json()
-        
-        # Extract the fact text
-        return data["text"]
-        
+        return _fetch_random_fact()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching fact: {e}")
         return "Error fetching fact"
-    except KeyError as e:
+    except (ValueError, KeyError) as e:
         print(f"Error parsing fact data: {e}")
         return "Error parsing fact data"
\ No newline at end of file
@@ -2,10 +2,14 @@
 """
 Morning Email System - Main Script
 Sends daily morning emails with fun facts, quotes, and weather information.
+
+The sections are individually switchable from the command line, e.g.
+`python3 main.py --no-weather` for a quote-and-fact-only email.
 """
 
-from utils import build_email_body, send_email
-from apis import get_random_quote, get_random_fact
+import argparse
+
+from utils import normalize_recipients, send_morning_emails
 from emails import (
     SMTP_SERVER,
     SMTP_PORT,
@@ -15,53 +19,49 @@ from emails import (
 )
 
 
+def parse_args():
+    """
+    Parse the command-line flags that switch email sections on and off.
+    """
+    parser = argparse.ArgumentParser(description="Send the daily morning email.")
+    parser.add_argument("--no-weather", action="store_true", help="skip the weather section")
+    parser.add_argument("--no-quote", action="store_true", help="skip the daily quote section")
+    parser.add_argument("--no-fact", action="store_true", help="skip the fun fact section")
+    return parser.parse_args()
+
+
 def main():
     """
     Main function to send morning emails to all recipients.
     """
+    args = parse_args()
+
     print("🌅 Starting Morning Email System...")
-    print(f"📧 Sending emails to {len(RECIPIENTS)} recipients")
-    
-    # Fetch quote and fact once for all recipients
-    print("\n📥 Fetching quote and fact...")
-    quote_data = get_random_quote()
-    fact_text = get_random_fact()
-    print(f"✅ Quote: \"{quote_data['quote'][:50]}...\" - {quote_data['author']}")
-    print(f"✅ Fact: {fact_text[:50]}...")
-    
-    # Send emails to all recipients
-    for recipient_name, recipient_email in RECIPIENTS.items():
-        print(f"\n📤 Preparing email for {recipient_name} ({recipient_email})...")
-        
-        # Build personalized email body with shared quote and fact
-        html_body = build_email_body(
-            recipient_name=recipient_name,
-            weather_info=True,
-            random_quote=True,
-            random_fact=True,
-            quote_data=quote_data,
-            fact_text=fact_text
-        )
-        
-        # Send the email
-        success = send_email(
-            recipient_email=recipient_email,
-            recipient_name=recipient_name,
-            email_content=html_body,
-            sender_email=SENDER_EMAIL,
-            sender_password=SENDER_PASSWORD,
-            smtp_server=SMTP_SERVER,
-            smtp_port=SMTP_PORT
-        )
-        
+    print(f"📧 Sending emails to {len(RECIPIENTS)} recipients\n")
+
+    # send_morning_emails fetches the shared content once, builds every
+    # message and sends the batch over one connection
+    results = send_morning_emails(
+        RECIPIENTS,
+        sender_email=SENDER_EMAIL,
+        sender_password=SENDER_PASSWORD,
+        smtp_server=SMTP_SERVER,
+        smtp_port=SMTP_PORT,
+        include_weather=not args.no_weather,
+        include_quote=not args.no_quote,
+        include_fact=not args.no_fact
+    )
+
+    names_by_email = {email: name for name, email, _ in normalize_recipients(RECIPIENTS)}
+    for recipient_email, success in results.items():
+        recipient_name = names_by_email.get(recipient_email, recipient_email)
         if success:
             print(f"✅ Email sent successfully to {recipient_name}")
         else:
             print(f"❌ Failed to send email to {recipient_name}")
-    
+
     print(f"\n🎉 Morning email process completed!")
 
 
 if __name__ == "__main__":
     main()
-
@@ -3,194 +3,752 @@ Utility functions for the morning email system.
 Includes functions for fetching weather, quotes, facts, and sending emails.
 """
 
+import re
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
 from datetime import datetime
 from apis import get_weather_info, get_random_quote, get_random_fact
 
 cities_locations = {
-    "Goettingen": {"latitude": 51.5413, "longitude": 9.9158},
-    "Bucharest": {"latitude": 44.4268, "longitude": 26.1025},
+    "Goettingen": {"latitude": 51.5413, "longitude": 9.9158, "display": "Göttingen"},
+    "Bucharest": {"latitude": 44.4268, "longitude": 26.1025, "display": "Bucharest"},
 }
 
-def send_email(recipient_email, recipient_name, email_content, sender_email, sender_password, smtp_server, smtp_port):
+# City used for recipients whose config entry doesn't name one
+DEFAULT_CITY = "Goettingen"
+
+
+def normalize_recipients(recipients):
     """
-    Send an email using SMTP.
-    
+    Flatten the RECIPIENTS config into (name, email, city) triples.
+
+    A recipient value may be a plain email string (city defaults to
+    DEFAULT_CITY) or a dict with 'email' and optional 'city' keys, so
+    existing configs keep working unchanged. A city that isn't in
+    cities_locations (e.g. a typo'd spelling) falls back to DEFAULT_CITY
+    with a warning instead of crashing the whole batch later.
+
     Args:
-        recipient_email (str): Recipient's email address
-        recipient_name (str): Recipient's name (for subject line)
-        email_content (str): HTML content of the email
-        sender_email (str): Sender's email address
-        sender_password (str): Sender's email password/app password
-        smtp_server (str): SMTP server address
-        smtp_port (int): SMTP port number
-    
+        recipients (dict): Mapping of recipient name to email or dict
+
     Returns:
-        bool: True if email sent successfully, False otherwise
+        list: (name, email, city) triples
     """
-    try:
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = f"Good Morning {recipient_name}! ☀️ {datetime.now().strftime('%b %d')}"
-        message["From"] = sender_email
-        message["To"] = recipient_email
-        
-        # Attach HTML content
-        html_part = MIMEText(email_content, "html")
-        message.attach(html_part)
-        
-        # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()  # Secure the connection
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, recipient_email, message.as_string())
-        
-        print(f"✓ Email sent successfully to {recipient_name} ({recipient_email})")
-        return True
-    
-    except Exception as e:
-        print(f"✗ Failed to send email to {recipient_name} ({recipient_email}): {str(e)}")
-        return False
+    normalized = []
+    for name, value in recipients.items():
+        if isinstance(value, dict):
+            city = value.get("city", DEFAULT_CITY)
+            if city not in cities_locations:
+                print(f"⚠️ Unknown city '{city}' for {name}, using {DEFAULT_CITY}")
+                city = DEFAULT_CITY
+            normalized.append((name, value["email"], city))
+        else:
+            normalized.append((name, value, DEFAULT_CITY))
+    return normalized
+
+# Deliberately loose sanity check - just enough to reject a typo'd config
+# entry before paying for an SMTP handshake, not full RFC 5322
+_EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
 
 
-def build_email_body(recipient_name="Boss", weather_info=True, random_quote=True, random_fact=True, quote_data=None, fact_text=None):
+def is_valid_email(address):
     """
-    Build the HTML email body with optional weather info, quote, and fact.
-    
+    Cheap plausibility check for an email address.
+
     Args:
-        recipient_name (str): Name of the email recipient
-        weather_info (bool): Whether to include weather information
-        random_quote (bool): Whether to include a random quote
-        random_fact (bool): Whether to include a random fact
-        quote_data (dict): Pre-fetched quote data (optional, will fetch if None)
-        fact_text (str): Pre-fetched fact text (optional, will fetch if None)
-    
+        address (str): Address to check
+
     Returns:
-        str: HTML formatted email body
+        bool: True if the address looks like an email address
     """
-    html_body = f"""
+    return bool(address) and _EMAIL_RE.fullmatch(address) is not None
+
+# Static HTML scaffold shared by every email. The CSS never changes per
+# recipient, so it's a plain module constant instead of being re-built
+# inside an f-string on every call.
+_EMAIL_HEAD = """
     <html>
     <head>
         <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px; text-align: center; }}
-            .section {{ margin: 20px 0; padding: 15px; background: #f9f9f9; border-radius: 8px; }}
-            .section h2 {{ color: #667eea; margin-top: 0; }}
-            table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
-            th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-            th {{ background-color: #667eea; color: white; }}
-            .quote {{ font-style: italic; font-size: 1.1em; margin: 10px 0; }}
-            .author {{ text-align: right; color: #666; }}
-            .fact {{ background: #e8f4fd; padding: 15px; border-left: 4px solid #667eea; margin: 10px 0; }}
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+            .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px; text-align: center; }
+            .section { margin: 20px 0; padding: 15px; background: #f9f9f9; border-radius: 8px; }
+            .section h2 { color: #667eea; margin-top: 0; }
+            table { width: 100%; border-collapse: collapse; margin: 10px 0; }
+            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+            th { background-color: #667eea; color: white; }
+            .quote { font-style: italic; font-size: 1.1em; margin: 10px 0; }
+            .author { text-align: right; color: #666; }
+            .fact { background: #e8f4fd; padding: 15px; border-left: 4px solid #667eea; margin: 10px 0; }
         </style>
     </head>
     <body>
         <div class="container">
+"""
+
+_EMAIL_FOOT = """
+        </div>
+    </body>
+    </html>
+    """
+
+# Per-section templates, prepared once at import time; build_email_body
+# only fills in the dynamic slots. Interpolated text goes through
+# html.escape so a stray < or & in a quote or name can't break the markup.
+_HEADER_SECTION_TMPL = """
             <div class="header">
                 <h1>Good Morning {recipient_name}! ☀️</h1>
                 <p>Here's your daily dose of information</p>
             </div>
     """
-    
-    # Add weather information if requested
-    if weather_info:
-        try:
-            weather_data = get_weather_info(
-                cities_locations["Goettingen"]["latitude"], 
-                cities_locations["Goettingen"]["longitude"]
-            )
-            
-            html_body += f"""
+
+_QUOTE_SECTION_TMPL = """
+            <div class="section">
+                <h2>💭 Daily Quote</h2>
+                <div class="quote">"{quote}"</div>
+                <div class="author">- {author}</div>
+            </div>
+            """
+
+_QUOTE_UNAVAILABLE_SECTION = """
+            <div class="section">
+                <h2>💭 Daily Quote</h2>
+                <p>Sorry, no quote available today.</p>
+            </div>
+            """
+
+_FACT_SECTION_TMPL = """
             <div class="section">
-                <h2>🌤️ Weather in Göttingen - {weather_data['date']}</h2>
+                <h2>🤓 Did You Know?</h2>
+                <div class="fact">{fact}</div>
+            </div>
+            """
+
+_FACT_UNAVAILABLE_SECTION = """
+            <div class="section">
+                <h2>🤓 Did You Know?</h2>
+                <p>Sorry, no fun fact available today.</p>
+            </div>
+            """
+
+_WEATHER_SECTION_HEAD_TMPL = """
+            <div class="section">
+                <h2>🌤️ Weather in {city} - {date}</h2>
                 <table>
                     <tr>
                         <th>Metric</th>
                         <th>Day Min</th>
                         <th>Day Max</th>
                     </tr>
-            """
-            
-            # Group weather data by metric type
-            metrics = {
-                "Temperature (°C)": ["max_temperature_day", "min_temperature_day"],
-                "Relative Humidity (%)": ["max_relative_humidity_day", "min_relative_humidity_day"],
-                "Apparent Temperature (°C)": ["max_apparent_temperature_day", "min_apparent_temperature_day"],
-                "Precipitation Probability (%)": ["max_precipitation_probability_day", "min_precipitation_probability_day"]
-            }
-            
-            for metric_name, keys in metrics.items():
-                min_key = keys[1]  # min key
-                max_key = keys[0]  # max key
-                html_body += f"""
-                    <tr>
-                        <td>{metric_name}</td>
-                        <td>{weather_data[min_key]:.1f}</td>
-                        <td>{weather_data[max_key]:.1f}</td>
-                    </tr>
-                """
-            
-            html_body += """
+    """
+
+_WEATHER_SECTION_FOOT = """
                 </table>
             </div>
             """
-        except Exception as e:
-            html_body += f"""
+
+# Weather metrics shown in the email table as (label, max key, min key);
+# an immutable tuple built once instead of per render call
+_WEATHER_METRICS = (
+    ("Temperature (°C)", "max_temperature_day", "min_temperature_day"),
+    ("Relative Humidity (%)", "max_relative_humidity_day", "min_relative_humidity_day"),
+    ("Apparent Temperature (°C)", "max_apparent_temperature_day", "min_apparent_temperature_day"),
+    ("Precipitation Probability (%)", "max_precipitation_probability_day", "min_precipitation_probability_day"),
+)
+
+# Fallback section used when the weather fetch fails
+WEATHER_UNAVAILABLE_SECTION = """
             <div class="section">
                 <h2>🌤️ Weather</h2>
                 <p>Sorry, weather information is currently unavailable.</p>
             </div>
             """
-    
-    # Add random quote if requested
-    if random_quote:
+
+
+def prefetch_content(include_weather=True, include_quote=True, include_fact=True, cities=("Goettingen",)):
+    """
+    Fetch weather, quote and fact concurrently on a small thread pool.
+
+    The API calls are independent blocking HTTP, so gathering them costs
+    one round-trip instead of one per call; disabled sections are never
+    fetched, and weather is fetched once per unique city no matter how
+    many recipients share it. build_email_body does no network IO itself,
+    so call this (or fetch the pieces another way) before building bodies.
+
+    Args:
+        include_weather (bool): Whether to fetch the weather
+        include_quote (bool): Whether to fetch the daily quote
+        include_fact (bool): Whether to fetch the fun fact
+        cities (iterable): City names (keys of cities_locations) to fetch
+            weather for
+
+    Returns:
+        tuple: (weather_by_city, quote_data, fact_text); weather_by_city
+            maps each requested city to its weather dict (None when the
+            fetch failed), and the other entries are None when disabled
+            or failed
+    """
+    unique_cities = tuple(dict.fromkeys(cities)) if include_weather else ()
+
+    # Size the pool to the work actually submitted: one thread per unique
+    # city plus one each for quote and fact, capped so a huge recipient
+    # list can't spawn a thread army. With everything disabled there is
+    # nothing to overlap, so skip the executor entirely.
+    task_count = len(unique_cities) + int(include_quote) + int(include_fact)
+    if task_count == 0:
+        return {}, None, None
+
+    with ThreadPoolExecutor(max_workers=min(8, task_count)) as executor:
+        weather_futures = {
+            city: executor.submit(
+                get_weather_info,
+                cities_locations[city]["latitude"],
+                cities_locations[city]["longitude"]
+            )
+            for city in unique_cities
+        }
+        quote_future = executor.submit(get_random_quote) if include_quote else None
+        fact_future = executor.submit(get_random_fact) if include_fact else None
+
+        weather_by_city = {}
+        for city, future in weather_futures.items():
+            try:
+                weather_by_city[city] = future.result()
+            except Exception as e:
+                print(f"Error fetching weather for {city}: {e}")
+                weather_by_city[city] = None
+        quote_data = quote_future.result() if quote_future else None
+        fact_text = fact_future.result() if fact_future else None
+
+    return weather_by_city, quote_data, fact_text
+
+
+def render_weather_section(weather_data, city="Goettingen"):
+    """
+    Render the weather HTML section from an already-fetched weather dict.
+
+    The section is identical for every recipient in the same city, so
+    callers sending to several people should render once per city and
+    pass the result to build_email_body.
+
+    Args:
+        weather_data (dict): Result of get_weather_info
+        city (str): City name shown in the heading; keys of
+            cities_locations resolve to their display spelling
+
+    Returns:
+        str: HTML for the weather section
+    """
+    display_city = cities_locations.get(city, {}).get("display", city)
+    section = _WEATHER_SECTION_HEAD_TMPL.format(city=escape(display_city), date=weather_data['date'])
+
+    # One join over the metric rows instead of growing the section string
+    # per metric
+    rows = "".join(
+        f"""
+                    <tr>
+                        <td>{metric_name}</td>
+                        <td>{weather_data[min_key]:.1f}</td>
+                        <td>{weather_data[max_key]:.1f}</td>
+                    </tr>
+                """
+        for metric_name, max_key, min_key in _WEATHER_METRICS
+    )
+
+    return section + rows + _WEATHER_SECTION_FOOT
+
+
+def _smtp_connect(smtp_server, smtp_port, sender_email, sender_password):
+    """
+    Open an authenticated SMTP connection.
+
+    Port 465 uses SMTP_SSL, which negotiates TLS immediately and saves
+    the EHLO/STARTTLS round-trip; any other port (e.g. 587) keeps the
+    STARTTLS upgrade. Set SMTP_PORT = 465 in emails.py to use it with
+    Gmail.
+
+    Returns:
+        smtplib.SMTP: Connected and logged-in server
+    """
+    if smtp_port == 465:
+        server = smtplib.SMTP_SSL(smtp_server, smtp_port)
+    else:
+        server = smtplib.SMTP(smtp_server, smtp_port)
+        server.starttls()  # Secure the connection
+    server.login(sender_email, sender_password)
+    return server
+
+
+def _build_message_skeleton(email_content, sender_email):
+    """
+    Build the recipient-independent part of a message.
+
+    The container with From set and the encoded HTML part is the
+    expensive piece of message construction; batch senders with a shared
+    body build it once and only rewrite To/Subject per recipient. The
+    modern EmailMessage API with the SMTP policy serializes faster than
+    the legacy email.mime classes and picks the lightest transfer
+    encoding for the body automatically.
+
+    Returns:
+        EmailMessage: Message with From and the HTML body set
+    """
+    message = EmailMessage(policy=SMTP_POLICY)
+    message["From"] = sender_email
+    message.set_content("This is an HTML email - please view it in an HTML-capable client.")
+    message.add_alternative(email_content, subtype="html")
+    return message
+
+
+def build_message(recipient_email, recipient_name, email_content, sender_email, subject_date=None):
+    """
+    Build the MIME message for a single recipient.
+
+    Args:
+        recipient_email (str): Recipient's email address
+        recipient_name (str): Recipient's name (for subject line)
+        email_content (str): HTML content of the email
+        sender_email (str): Sender's email address
+        subject_date (str): Date string for the subject line; batch callers
+            should compute it once so messages sent across midnight agree
+
+    Returns:
+        EmailMessage: Ready-to-send message with headers and HTML body set
+    """
+    if subject_date is None:
+        subject_date = datetime.now().strftime('%b %d')
+    message = _build_message_skeleton(email_content, sender_email)
+    message["Subject"] = f"Good Morning {recipient_name}! ☀️ {subject_date}"
+    message["To"] = recipient_email
+    return message
+
+
+class SMTPSession:
+    """
+    One authenticated SMTP connection shared by a batch of sends.
+
+    Connecting, the TLS handshake and login happen once in __enter__;
+    each send afterwards only pays the message round-trip. A failed send
+    does not abort the rest of the batch: its error is recorded in
+    self.errors (keyed by recipient) instead of being printed mid-loop,
+    so the send loop isn't stalled by stdout writes - report from errors
+    after the batch. Providers drop sessions that go quiet, so after an
+    idle gap the connection is probed with a NOOP, and a send that hits a
+    dropped connection reconnects and retries once.
+
+    Usage:
+        with SMTPSession(sender_email, sender_password, smtp_server, smtp_port) as session:
+            for recipient_name, recipient_email in recipients.items():
+                session.send(recipient_email, recipient_name, html_body)
+    """
+
+    # Idle seconds after which the connection is probed before sending
+    _IDLE_CHECK_SECONDS = 60
+
+    def __init__(self, sender_email, sender_password, smtp_server, smtp_port):
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.server = None
+        self.subject_date = None
+        self.errors = {}
+        self._last_activity = 0.0
+
+    def __enter__(self):
+        # One date for the whole batch, so sends that straddle midnight
+        # still carry the same subject line (and skip N-1 strftime calls)
+        self.subject_date = datetime.now().strftime('%b %d')
+        self.server = _smtp_connect(self.smtp_server, self.smtp_port, self.sender_email, self.sender_password)
+        self._last_activity = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
         try:
-            # Use provided quote_data or fetch a new one
-            if quote_data is None:
-                quote_data = get_random_quote()
-            html_body += f"""
-            <div class="section">
-                <h2>💭 Daily Quote</h2>
-                <div class="quote">"{quote_data['quote']}"</div>
-                <div class="author">- {quote_data['author']}</div>
-            </div>
-            """
+            self.server.quit()
+        except Exception:
+            pass  # socket may already be gone; nothing left to clean up
+        self.server = None
+
+    def send(self, recipient_email, recipient_name, email_content):
+        """
+        Build and send one message over the open connection.
+
+        Args:
+            recipient_email (str): Recipient's email address
+            recipient_name (str): Recipient's name (for subject line)
+            email_content (str): HTML content of the email
+
+        Returns:
+            bool: True if email sent successfully, False otherwise
+        """
+        message = build_message(recipient_email, recipient_name, email_content, self.sender_email,
+                                subject_date=self.subject_date)
+        return self.send_message(message)
+
+    def send_message(self, message):
+        """
+        Send an already-built MIME message over the open connection.
+
+        Args:
+            message (EmailMessage): Message with From/To/Subject set
+
+        Returns:
+            bool: True if email sent successfully, False otherwise
+        """
+        recipient_email = message["To"]
+
+        # After a long gap the server may have dropped us; probe cheaply
+        # and reconnect before wasting the send attempt
+        if time.monotonic() - self._last_activity > self._IDLE_CHECK_SECONDS:
+            try:
+                self.server.noop()
+            except Exception:
+                self._reconnect()
+
+        try:
+            # send_message serializes straight to bytes (BytesGenerator),
+            # skipping the intermediate str that as_string() would build
+            self.server.send_message(message)
+            self._last_activity = time.monotonic()
+            return True
+        except smtplib.SMTPServerDisconnected:
+            # The session died under us: reconnect, re-login and retry once
+            try:
+                self._reconnect()
+                self.server.send_message(message)
+                self._last_activity = time.monotonic()
+                return True
+            except Exception as e:
+                self.errors[recipient_email] = str(e)
+                return False
         except Exception as e:
-            html_body += """
-            <div class="section">
-                <h2>💭 Daily Quote</h2>
-                <p>Sorry, no quote available today.</p>
-            </div>
-            """
-    
-    # Add random fact if requested
-    if random_fact:
+            self.errors[recipient_email] = str(e)
+            return False
+
+    def _reconnect(self):
+        """
+        Re-open and re-authenticate after the server dropped the session.
+        """
         try:
-            # Use provided fact_text or fetch a new one
-            if fact_text is None:
-                fact_text = get_random_fact()
-            html_body += f"""
-            <div class="section">
-                <h2>🤓 Did You Know?</h2>
-                <div class="fact">{fact_text}</div>
-            </div>
-            """
+            self.server.close()
+        except Exception:
+            pass
+        self.server = _smtp_connect(self.smtp_server, self.smtp_port, self.sender_email, self.sender_password)
+        self._last_activity = time.monotonic()
+
+
+def send_emails_bulk(messages, sender_email, sender_password, smtp_server, smtp_port, pool_size=1):
+    """
+    Send several prepared messages over one or more SMTP connections.
+
+    The connection, TLS handshake and login are done once per connection
+    instead of once per recipient, so only the sendmail round-trip is
+    paid per message. With pool_size > 1 the batch is split round-robin
+    across that many parallel connections (one thread each), which helps
+    large recipient lists where a single connection serializes the sends;
+    keep it small (3-5), providers limit concurrent sessions.
+
+    Args:
+        messages (list): MIME messages with "To" and "Subject" already set
+        sender_email (str): Sender's email address
+        sender_password (str): Sender's email password/app password
+        smtp_server (str): SMTP server address
+        smtp_port (int): SMTP port number
+        pool_size (int): Number of parallel SMTP connections to use
+
+    Returns:
+        dict: Mapping of recipient address to True/False send status
+    """
+    if pool_size > 1 and len(messages) > 1:
+        num_connections = min(pool_size, len(messages))
+        chunks = [messages[i::num_connections] for i in range(num_connections)]
+        results = {}
+        with ThreadPoolExecutor(max_workers=num_connections) as executor:
+            futures = [
+                executor.submit(send_emails_bulk, chunk, sender_email, sender_password, smtp_server, smtp_port)
+                for chunk in chunks
+            ]
+            for future in futures:
+                results.update(future.result())
+        return results
+
+    # Weed out implausible addresses before paying for the handshake; if
+    # nothing survives, no connection is opened at all
+    results = {}
+    valid_messages = []
+    for message in messages:
+        if is_valid_email(message["To"]):
+            valid_messages.append(message)
+        else:
+            print(f"✗ Invalid recipient address: {message['To']}")
+            results[message["To"]] = False
+    if not valid_messages:
+        return results
+
+    # Failures are collected by the session and reported after the batch,
+    # so the send loop never blocks on stdout between messages
+    session = SMTPSession(sender_email, sender_password, smtp_server, smtp_port)
+    try:
+        with session:
+            for message in valid_messages:
+                results[message["To"]] = session.send_message(message)
+    except Exception as e:
+        print(f"✗ SMTP connection failed: {str(e)}")
+        # Anything not yet attempted counts as failed
+        for message in valid_messages:
+            results.setdefault(message["To"], False)
+
+    for recipient_email, error in session.errors.items():
+        print(f"✗ Failed to send email to {recipient_email}: {error}")
+
+    return results
+
+
+def send_same_email_bulk(recipients, email_content, sender_email, sender_password, smtp_server, smtp_port):
+    """
+    Send one shared HTML body to several recipients over one connection.
+
+    The MIME structure and the HTML part encoding are built once; only the
+    To and Subject headers are rewritten per recipient. Use this when the
+    body is not personalized; for per-recipient bodies build the messages
+    yourself and use send_emails_bulk.
+
+    Args:
+        recipients (dict): Mapping of recipient name to email address
+        email_content (str): HTML content shared by every recipient
+        sender_email (str): Sender's email address
+        sender_password (str): Sender's email password/app password
+        smtp_server (str): SMTP server address
+        smtp_port (int): SMTP port number
+
+    Returns:
+        dict: Mapping of recipient address to True/False send status
+    """
+    base_message = _build_message_skeleton(email_content, sender_email)
+    subject_date = datetime.now().strftime('%b %d')
+
+    results = {}
+    errors = {}
+    valid_recipients = {}
+    for recipient_name, recipient_email in recipients.items():
+        if is_valid_email(recipient_email):
+            valid_recipients[recipient_name] = recipient_email
+        else:
+            print(f"✗ Invalid recipient address: {recipient_email}")
+            results[recipient_email] = False
+    if not valid_recipients:
+        return results
+
+    try:
+        with _smtp_connect(smtp_server, smtp_port, sender_email, sender_password) as server:
+            for recipient_name, recipient_email in valid_recipients.items():
+                # Rewrite only the per-recipient headers on the shared message
+                del base_message["To"]
+                del base_message["Subject"]
+                base_message["To"] = recipient_email
+                base_message["Subject"] = f"Good Morning {recipient_name}! ☀️ {subject_date}"
+                try:
+                    server.send_message(base_message)
+                    results[recipient_email] = True
+                except Exception as e:
+                    # Report after the batch, off the send loop
+                    errors[recipient_email] = str(e)
+                    results[recipient_email] = False
+    except Exception as e:
+        print(f"✗ SMTP connection failed: {str(e)}")
+        for recipient_email in valid_recipients.values():
+            results.setdefault(recipient_email, False)
+
+    for recipient_email, error in errors.items():
+        print(f"✗ Failed to send email to {recipient_email}: {error}")
+
+    return results
+
+
+def send_email(recipient_email, recipient_name, email_content, sender_email, sender_password, smtp_server, smtp_port, message=None):
+    """
+    Send an email using SMTP.
+
+    Opens a fresh connection for this one message; for several recipients
+    prefer send_emails_bulk, which reuses one connection. Passing a
+    pre-built message skips the MIME construction here entirely, keeping
+    it off the connection's critical path.
+
+    Args:
+        recipient_email (str): Recipient's email address
+        recipient_name (str): Recipient's name (for subject line)
+        email_content (str): HTML content of the email (ignored when
+            message is given)
+        sender_email (str): Sender's email address
+        sender_password (str): Sender's email password/app password
+        smtp_server (str): SMTP server address
+        smtp_port (int): SMTP port number
+        message: Pre-built message (from build_message) to send as-is
+
+    Returns:
+        bool: True if email sent successfully, False otherwise
+    """
+    # A malformed address fails here for free instead of after TCP, TLS
+    # and login
+    if not is_valid_email(recipient_email):
+        print(f"✗ Invalid recipient address: {recipient_email}")
+        return False
+
+    try:
+        # Build the message (if not supplied) before connecting, so the
+        # connection is only held for the actual send
+        if message is None:
+            message = build_message(recipient_email, recipient_name, email_content, sender_email)
+
+        with _smtp_connect(smtp_server, smtp_port, sender_email, sender_password) as server:
+            server.send_message(message)
+
+        print(f"✓ Email sent successfully to {recipient_name} ({recipient_email})")
+        return True
+
+    except Exception as e:
+        print(f"✗ Failed to send email to {recipient_name} ({recipient_email}): {str(e)}")
+        return False
+
+
+def build_email_body(recipient_name="Boss", weather_info=True, random_quote=True, random_fact=True, quote_data=None, fact_text=None, weather_section=None):
+    """
+    Build the HTML email body with optional weather info, quote, and fact.
+
+    This function is pure templating and performs no network IO: fetch the
+    content first, e.g. with prefetch_content, and pass it in. A section
+    whose flag is set but whose data is missing renders its fallback text.
+
+    Args:
+        recipient_name (str): Name of the email recipient
+        weather_info (dict): Pre-fetched weather data (from get_weather_info)
+        random_quote (bool): Whether to include a random quote
+        random_fact (bool): Whether to include a random fact
+        quote_data (dict): Pre-fetched quote data
+        fact_text (str): Pre-fetched fact text
+        weather_section (str): Pre-rendered weather HTML (takes precedence
+            over weather_info)
+
+    Returns:
+        str: HTML formatted email body
+    """
+    # Collect the sections in a list and join once at the end, so the
+    # body is assembled without reallocating a growing string per section.
+    # Only the greeting is dynamic; the CSS scaffold comes from the
+    # module-level constant
+    parts = [_EMAIL_HEAD, _HEADER_SECTION_TMPL.format(recipient_name=escape(recipient_name))]
+
+    # Add weather information if requested; a pre-rendered section avoids
+    # re-fetching and re-formatting the same table for every recipient
+    if weather_section is not None:
+        parts.append(weather_section)
+    elif weather_info:
+        try:
+            parts.append(render_weather_section(weather_info))
         except Exception as e:
-            html_body += """
-            <div class="section">
-                <h2>🤓 Did You Know?</h2>
-                <p>Sorry, no fun fact available today.</p>
-            </div>
-            """
-    
-    html_body += """
-        </div>
-    </body>
-    </html>
+            parts.append(WEATHER_UNAVAILABLE_SECTION)
+
+    # Add random quote if requested
+    if random_quote:
+        if quote_data:
+            parts.append(_QUOTE_SECTION_TMPL.format(
+                quote=escape(quote_data['quote']),
+                author=escape(quote_data['author'])
+            ))
+        else:
+            parts.append(_QUOTE_UNAVAILABLE_SECTION)
+
+    # Add random fact if requested
+    if random_fact:
+        if fact_text:
+            parts.append(_FACT_SECTION_TMPL.format(fact=escape(fact_text)))
+        else:
+            parts.append(_FACT_UNAVAILABLE_SECTION)
+
+    parts.append(_EMAIL_FOOT)
+
+    return "".join(parts)
+
+
+def send_morning_emails(recipients, sender_email, sender_password, smtp_server, smtp_port,
+                        include_weather=True, include_quote=True, include_fact=True):
     """
-    
-    return html_body
+    Fetch the day's content once and send everyone's morning email.
+
+    This is the whole-batch entry point: the quote and fact are fetched
+    once and shared by all recipients, weather is fetched and rendered
+    once per unique city, every message is built up front, and the batch
+    goes out over one reused SMTP connection. Callers should not loop
+    over build_email_body with their own fetches - that re-pays the API
+    calls per recipient.
+
+    Args:
+        recipients (dict): RECIPIENTS-style mapping of name to email
+            address or to a dict with 'email' and optional 'city' keys
+        sender_email (str): Sender's email address
+        sender_password (str): Sender's email password/app password
+        smtp_server (str): SMTP server address
+        smtp_port (int): SMTP port number
+        include_weather (bool): Whether to include the weather section
+        include_quote (bool): Whether to include the daily quote
+        include_fact (bool): Whether to include the fun fact
+
+    Returns:
+        dict: Mapping of recipient address to True/False send status
+    """
+    normalized = normalize_recipients(recipients)
+    cities = [city for _, _, city in normalized]
+
+    print("📥 Fetching daily content...")
+    weather_by_city, quote_data, fact_text = prefetch_content(
+        include_weather=include_weather,
+        include_quote=include_quote,
+        include_fact=include_fact,
+        cities=cities
+    )
+    if quote_data:
+        print(f"✅ Quote: \"{quote_data['quote'][:50]}...\" - {quote_data['author']}")
+    if fact_text:
+        print(f"✅ Fact: {fact_text[:50]}...")
+
+    # Render each city's weather table once, shared by its recipients
+    weather_sections = {}
+    for city, weather_data in weather_by_city.items():
+        try:
+            weather_sections[city] = render_weather_section(weather_data, city=city)
+        except Exception:
+            weather_sections[city] = WEATHER_UNAVAILABLE_SECTION
+
+    # Build all personalized messages first, then send them over a single
+    # SMTP connection so TLS and login happen only once. The subject date
+    # is computed once so the whole batch agrees on it.
+    subject_date = datetime.now().strftime('%b %d')
+    messages = []
+    for recipient_name, recipient_email, city in normalized:
+        html_body = build_email_body(
+            recipient_name=recipient_name,
+            weather_info=include_weather,
+            random_quote=include_quote,
+            random_fact=include_fact,
+            quote_data=quote_data,
+            fact_text=fact_text,
+            weather_section=weather_sections.get(city)
+        )
+        messages.append(build_message(recipient_email, recipient_name, html_body, sender_email,
+                                      subject_date=subject_date))
+
+    print(f"📡 Sending {len(messages)} emails over one connection...")
+    return send_emails_bulk(
+        messages,
+        sender_email=sender_email,
+        sender_password=sender_password,
+        smtp_server=smtp_server,
+        smtp_port=smtp_port
+    )
 